@@ -1,6 +1,7 @@
 from celery import Celery
 from celery.schedules import crontab
 from jira_monitor.config import settings
+from jira_monitor.serialization import register_serializer
 
 redis = settings.redis_settings
 
@@ -8,19 +9,36 @@ app = Celery('jira_monitor',
              broker=redis.redis_url,
              backend=redis.redis_url)
 
+register_serializer()
 app.config_from_object('celeryconfig')
 
 report = settings.report_settings
+polling = settings.polling_settings
+outbox = settings.outbox_settings
+digest = settings.digest_settings
+health = settings.health_settings
 app.conf.update(
     beat_schedule={
-        'check-jira-tasks': {
-            'task': 'jira_monitor.tasks.check_jira_tasks',
+        'poll-jira-tasks': {
+            'task': 'jira_monitor.tasks.poll_jira_tasks',
             # 'schedule': crontab(
             #     day_of_month=settings.report_day_of_month,
             #     hour=settings.report_hour,
             #     minute=settings.report_minute
             # ),
-            'schedule': 20.0,
+            'schedule': polling.poll_min_interval,
+        },
+        'send-outbox': {
+            'task': 'jira_monitor.tasks.send_outbox',
+            'schedule': outbox.outbox_drain_interval,
+        },
+        'flush-digest': {
+            'task': 'jira_monitor.tasks.flush_digest',
+            'schedule': digest.digest_check_interval,
+        },
+        'run-health-probes': {
+            'task': 'jira_monitor.tasks.run_health_probes',
+            'schedule': health.health_probe_interval,
         }
     },
     beat_schedule_filename='celerybeat-schedule',
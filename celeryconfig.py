@@ -1,13 +1,17 @@
 from jira_monitor.config import settings
 
 redis = settings.redis_settings
+serialization = settings.serialization_settings
 
 broker_url = redis.redis_url
 result_backend = redis.redis_url
 
+# по умолчанию JSON; задачи, передающие списки задач Jira, включают msgpack-z сами:
+# @app.task(serializer='msgpack-z') или apply_async(..., serializer='msgpack-z')
 task_serializer = 'json'
-accept_content = ['json']
-result_serializer = 'json'
+accept_content = ['json', 'msgpack-z']
+result_serializer = serialization.result_serializer
+result_accept_content = ['json', 'msgpack-z']
 timezone = 'Europe/Moscow'
 enable_utc = True
 broker_connection_retry_on_startup = True
\ No newline at end of file
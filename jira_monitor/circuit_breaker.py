@@ -0,0 +1,118 @@
+import time
+from typing import Any, Callable, Dict
+
+from .config import settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Сервис {name} недоступен, повтор через {retry_after:.0f} сек")
+
+
+class CircuitBreaker:
+    """Общий для всех воркеров предохранитель вокруг внешней зависимости.
+
+    После failure_threshold ошибок подряд переходит в open и сразу отклоняет
+    вызовы. Через recovery_timeout пропускает один пробный вызов (half-open):
+    успех закрывает цепь, ошибка снова открывает ее. is_failure отбирает ошибки,
+    означающие недоступность сервиса; остальные (неверный запрос, нет прав)
+    пробрасываются, не размыкая цепь.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, redis_client=None,
+                 is_failure: Callable[[Exception], bool] = None):
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.redis = redis_client or get_redis()
+        self.state_key = make_key('circuit', name)
+        self.trial_key = make_key('circuit', name, 'trial')
+
+    def get_state(self, now: float = None) -> str:
+        now = time.time() if now is None else now
+        state = self.redis.hgetall(self.state_key)
+        if state.get('state') != OPEN:
+            return CLOSED
+        if now >= float(state['opened_at']) + self.recovery_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow_request(self) -> bool:
+        state = self.get_state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            # пробный вызов получает только один воркер
+            return bool(self.redis.set(self.trial_key, 1, nx=True, ex=max(int(self.recovery_timeout), 1)))
+        return False
+
+    def record_success(self):
+        if self.redis.exists(self.state_key):
+            logger.info(f"Circuit breaker {self.name}: цепь закрыта")
+        self.redis.delete(self.state_key, self.trial_key)
+
+    def record_failure(self):
+        if self.get_state() == HALF_OPEN:
+            self._open()
+            return
+
+        failures = self.redis.hincrby(self.state_key, 'failures', 1)
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.redis.hset(self.state_key, mapping={'state': OPEN, 'opened_at': time.time()})
+        self.redis.delete(self.trial_key)
+        logger.warning(f"Circuit breaker {self.name}: цепь разомкнута на {self.recovery_timeout:.0f} сек")
+
+    def retry_after(self) -> float:
+        opened_at = self.redis.hget(self.state_key, 'opened_at')
+        if opened_at is None:
+            return 0.0
+        return max(float(opened_at) + self.recovery_timeout - time.time(), 0.0)
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure is None or self.is_failure(e):
+                self.record_failure()
+            else:
+                # сервис ответил, пусть и ошибкой запроса, - значит он доступен
+                self.record_success()
+            raise
+
+        self.record_success()
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        state = self.redis.hgetall(self.state_key)
+        return {
+            'state': self.get_state(),
+            'failures': int(state.get('failures', 0)),
+            'retry_after': round(self.retry_after(), 1),
+        }
+
+
+def create_circuit_breaker(name: str, is_failure: Callable[[Exception], bool] = None) -> CircuitBreaker:
+    breaker = settings.circuit_breaker_settings
+    return CircuitBreaker(
+        name=name,
+        failure_threshold=breaker.failure_threshold,
+        recovery_timeout=breaker.recovery_timeout,
+        is_failure=is_failure
+    )
@@ -0,0 +1,163 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ..logger_config import setup_logger
+
+logger = setup_logger()
+
+ANONYMIZED_URL = 'https://jira.example'
+USER_FIELDS = ('displayName', 'emailAddress', 'accountId', 'name', 'key')
+
+
+class CassetteMissError(Exception):
+    pass
+
+
+def request_key(method: str, url: str, body: Any = None) -> str:
+    parts = urlsplit(url)
+    key = f"{method.upper()} {parts.path}"
+    if parts.query:
+        key += '?' + urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if body:
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key += ' #' + hashlib.sha1(body).hexdigest()[:12]
+    return key
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Транспорт requests, который дописывает каждый ответ Jira в кассету (gzip JSON Lines)."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        key = request_key(request.method, request.url, request.body)
+        interaction = {
+            'key': key,
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', 'application/json'),
+            'body': response.content.decode(response.encoding or 'utf-8', errors='replace'),
+            'elapsed': response.elapsed.total_seconds(),
+        }
+
+        with self._lock:
+            self.calls[key.split('?')[0]] += 1
+            # каждая запись - отдельный член gzip, файл читается целиком через gzip.open
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(interaction, ensure_ascii=False) + '\n')
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Отдает записанные ответы вместо обращения к Jira.
+
+    Повторные одинаковые запросы получают ответы в порядке записи, последний
+    ответ повторяется. latency=None воспроизводит записанные задержки, число
+    задает фиксированную задержку на запрос. Уже загруженная кассета
+    передается через interactions, чтобы не читать файл на каждый цикл.
+    """
+
+    def __init__(self, path: str = None, latency: float = 0.0, interactions: List[Dict[str, Any]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.calls = Counter()
+        self._responses = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        if interactions is None:
+            interactions = load_cassette(path)
+            logger.info(f"Кассета {path}: загружено {len(interactions)} ответов")
+        for interaction in interactions:
+            self._responses[interaction['key']].append(interaction)
+
+    def _next(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                raise CassetteMissError(f"В кассете нет ответа для запроса {key}")
+            self.calls[key.split('?')[0]] += 1
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def send(self, request, **kwargs):
+        interaction = self._next(request_key(request.method, request.url, request.body))
+
+        delay = interaction['elapsed'] if self.latency is None else self.latency
+        if delay:
+            time.sleep(delay)
+
+        response = Response()
+        response.status_code = interaction['status']
+        response.headers = CaseInsensitiveDict({'Content-Type': interaction['content_type']})
+        response._content = interaction['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if response.status_code < 400 else 'Error'
+        response.connection = self
+        return response
+
+
+def _pseudonym(value: str) -> str:
+    return 'user-' + hashlib.sha1(value.encode('utf-8')).hexdigest()[:10]
+
+
+def _anonymize_value(value: Any, base_url: str) -> Any:
+    if isinstance(value, dict):
+        is_user = 'emailAddress' in value or 'accountId' in value or 'avatarUrls' in value
+        result = {}
+        for field, item in value.items():
+            if is_user and field in USER_FIELDS and isinstance(item, str):
+                result[field] = _pseudonym(item)
+            elif field == 'avatarUrls':
+                result[field] = {}
+            else:
+                result[field] = _anonymize_value(item, base_url)
+        return result
+    if isinstance(value, list):
+        return [_anonymize_value(item, base_url) for item in value]
+    if isinstance(value, str) and base_url:
+        return value.replace(base_url, ANONYMIZED_URL)
+    return value
+
+
+def anonymize_cassette(src: str, dst: str, base_url: str = None) -> Tuple[int, int]:
+    """Заменяет данные пользователей псевдонимами и адрес Jira на ANONYMIZED_URL."""
+    base_url = base_url.rstrip('/') if base_url else None
+    interactions = load_cassette(src)
+    anonymized = 0
+
+    with gzip.open(dst, 'wt', encoding='utf-8') as f:
+        for interaction in interactions:
+            try:
+                body = json.loads(interaction['body'])
+            except ValueError:
+                body = None
+
+            if body is not None:
+                interaction['body'] = json.dumps(_anonymize_value(body, base_url), ensure_ascii=False)
+                anonymized += 1
+            f.write(json.dumps(interaction, ensure_ascii=False) + '\n')
+
+    return len(interactions), anonymized
@@ -3,10 +3,24 @@ from email.mime.multipart import MIMEMultipart
 from typing import List, Dict, Any, Tuple
 from ..logger_config import setup_logger
 from ..config import CHANGE_MAPPING, CHANGE_ORDER
+from .jira_client import UNAVAILABLE_ERRORS
 
 logger = setup_logger()
 
 
+def build_message(sender: str, recipients: List[str], subject: str, content: str, subtype: str = 'html'):
+    if subtype == 'html':
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(content, 'html', 'utf-8'))
+    else:
+        msg = MIMEText(content, subtype, 'utf-8')
+
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = ', '.join(recipients)
+    return msg
+
+
 def group_tasks_by_change(issues: List[Dict], change_field_id: str) -> Dict[str, List[Dict]]:
     tasks_by_change = {}
     for issue in issues:
@@ -52,6 +66,8 @@ class EmailClient:
                 latest_version = max(versions, key=lambda x: x.id)
                 return latest_version.name
 
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Ошибка получения версий: {e}")
 
@@ -150,14 +166,7 @@ class EmailClient:
     def send_email(self, recipients: List[str], subject: str, html_content: str) -> bool:
         try:
             with self.smtp_client.get_connection() as server:
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = self.smtp_client.email_user
-                msg['To'] = ', '.join(recipients)
-
-                html_part = MIMEText(html_content, 'html', 'utf-8')
-                msg.attach(html_part)
-
+                msg = build_message(self.smtp_client.email_user, recipients, subject, html_content, 'html')
                 server.send_message(msg)
 
             logger.info(f"Email отправлен получателям: {', '.join(recipients)}")
@@ -169,11 +178,7 @@ class EmailClient:
     def send_simple_email(self, recipients: List[str], subject: str, text_content: str) -> bool:
         try:
             with self.smtp_client.get_connection() as server:
-                msg = MIMEText(text_content, 'plain', 'utf-8')
-                msg['Subject'] = subject
-                msg['From'] = self.smtp_client.email_user
-                msg['To'] = ', '.join(recipients)
-
+                msg = build_message(self.smtp_client.email_user, recipients, subject, text_content, 'plain')
                 server.send_message(msg)
 
             logger.info(f"Простое email отправлено получателям: {', '.join(recipients)}")
@@ -197,4 +202,25 @@ class EmailClient:
         """
 
         logger.info(f"Сформировано простое уведомление для задачи {issue_key}")
+        return subject, text_content
+
+    def generate_digest_notification(self, issues: Dict[str, str]) -> Tuple[str, str]:
+        subject = f"Выполнено задач: {len(issues)}"
+
+        issues_text = "\n".join(
+            f"  - {issue_key} - {summary}: {self.jira_external_url}/browse/{issue_key}"
+            for issue_key, summary in sorted(issues.items())
+        )
+
+        text_content = f"""
+Здравствуйте!
+
+Выполнены задачи:
+{issues_text}
+
+С уважением,
+Группа разработки {self.project_name} платформы, BI.ZONE
+        """
+
+        logger.info(f"Сформирован дайджест по {len(issues)} задачам")
         return subject, text_content
\ No newline at end of file
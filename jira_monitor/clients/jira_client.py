@@ -1,26 +1,67 @@
 from jira import JIRA
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+from ..circuit_breaker import CircuitBreaker, CircuitOpenError
+from .cassette import RecordingAdapter, ReplayAdapter
 from ..logger_config import setup_logger
 
 logger = setup_logger()
 
+# недоступность Jira не должна выглядеть как "задач не найдено", такие ошибки пробрасываются
+UNAVAILABLE_ERRORS = (CircuitOpenError, RequestsConnectionError, Timeout)
+
+
+def is_jira_unavailable(exc: Exception) -> bool:
+    if isinstance(exc, UNAVAILABLE_ERRORS):
+        return True
+    status_code = getattr(exc, 'status_code', None)
+    return status_code is not None and status_code >= 500
+
 
 class JiraClient:
-    def __init__(self, jira_url: str, jira_token: str, project_key: str, report_day: int, report_hour: int, report_minute: int):
-        self.jira = JIRA(
+    def __init__(self, jira_url: str, jira_token: str, project_key: str, report_day: int, report_hour: int, report_minute: int,
+                 timeout: tuple[float, float] = None, breaker: CircuitBreaker = None,
+                 cassette_mode: str = 'off', cassette_path: str = None, replay_latency: float | None = 0.0,
+                 cassette_interactions: list = None, get_server_info: bool = True):
+        self.breaker = breaker
+        # в режиме кассеты все запросы должны идти через одну сессию, поэтому без async_ и serverInfo в конструкторе
+        use_cassette = cassette_mode in ('record', 'replay')
+        self.jira = self._call(
+            JIRA,
             token_auth=jira_token,
             options={"server": jira_url, "verify": False},
-            async_=True,
+            async_=not use_cassette,
+            timeout=timeout,
+            # повторы ResilientSession с экспоненциальными паузами держали бы воркер минутами,
+            # отказ определяют таймауты и circuit breaker
+            max_retries=0,
+            get_server_info=get_server_info and not use_cassette,
         )
+
+        self.transport = None
+        if cassette_mode == 'record':
+            self.transport = RecordingAdapter(cassette_path)
+        elif cassette_mode == 'replay':
+            self.transport = ReplayAdapter(cassette_path, latency=replay_latency, interactions=cassette_interactions)
+        if self.transport:
+            logger.info(f"Jira в режиме {cassette_mode}, кассета: {cassette_path}")
+            self.jira._session.mount('http://', self.transport)
+            self.jira._session.mount('https://', self.transport)
+
         self.project_key = project_key
         self.report_day = report_day
         self.report_hour = report_hour
         self.report_minute = report_minute
 
+    def _call(self, func: Callable, *args, **kwargs) -> Any:
+        if self.breaker:
+            return self.breaker.call(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
     def get_field_id(self, field_name: str) -> Optional[str]:
         try:
-            fields = self.jira.fields()
+            fields = self._call(self.jira.fields)
 
             for field in fields:
                 if field['name'].lower() == field_name.lower():
@@ -29,21 +70,28 @@ class JiraClient:
 
             logger.warning(f"Поле {field_name} не найдено")
             return None
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Ошибка поиска поля {field_name}: {e}")
             return None
 
+    def get_report_period(self, now: datetime = None) -> tuple[datetime, datetime]:
+        now = now or datetime.now()
+        current_period = now.replace(day=self.report_day, hour=self.report_hour,
+                                     minute=self.report_minute, second=0, microsecond=0)
+
+        if current_period.month == 1:
+            previous_period = current_period.replace(year=current_period.year - 1, month=12)
+        else:
+            previous_period = current_period.replace(month=current_period.month - 1)
+
+        return previous_period, current_period
+
     def filter_completed_issues(self, release_title_field_id: str = None, change_field_id: str = None) -> tuple[dict[
         str, list[Any] | int], None] | tuple[dict[str, list[Any] | int | str | None], str]:
         try:
-            now = datetime.now()
-            current_period = now.replace(day=self.report_day, hour=self.report_hour,
-                                         minute=self.report_minute, second=0, microsecond=0)
-
-            if current_period.month == 1:
-                previous_period = current_period.replace(year=current_period.year - 1, month=12)
-            else:
-                previous_period = current_period.replace(month=current_period.month - 1)
+            previous_period, current_period = self.get_report_period()
 
             start_date = previous_period.strftime('%Y-%m-%d %H:%M')
             end_date = current_period.strftime('%Y-%m-%d %H:%M')
@@ -74,7 +122,8 @@ class JiraClient:
 
             logger.info(f"JQL фильтр: {jql}")
 
-            issues = self.jira.search_issues(
+            issues = self._call(
+                self.jira.search_issues,
                 jql,
                 fields=fields,
                 maxResults=100
@@ -142,15 +191,35 @@ class JiraClient:
 
             return result, "Готово"
 
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Ошибка фильтрации задач: {e}")
             return {'issues': [], 'total': 0}, None
 
+    def probe_changes(self) -> dict[str, int | str | None]:
+        # search_issues трактует maxResults=0 как "выгрузить все", поэтому идем в REST напрямую:
+        # один запрос отдает и общее число задач, и самую свежую по updated
+        data = self._call(self.jira._get_json, 'search', params={
+            'jql': f'project = "{self.project_key}" ORDER BY updated DESC',
+            'fields': 'updated',
+            'maxResults': 1,
+        })
+        issues = data.get('issues') or []
+        last_updated = issues[0]['fields'].get('updated') if issues else None
+        # смена отчетного периода - тоже изменение, даже если в Jira за это время ничего не правили
+        period_start, _ = self.get_report_period()
+        return {
+            'total': data.get('total', 0),
+            'last_updated': last_updated,
+            'period_start': period_start.isoformat(),
+        }
+
     def project(self, project_key: str):
-        return self.jira.project(project_key)
+        return self._call(self.jira.project, project_key)
 
     def project_versions(self, project):
-        return self.jira.project_versions(project)
+        return self._call(self.jira.project_versions, project)
 
     def myself(self):
-        return self.jira.myself()
+        return self._call(self.jira.myself)
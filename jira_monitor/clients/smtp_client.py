@@ -1,18 +1,41 @@
 import smtplib
+from ..circuit_breaker import CircuitBreaker
 from ..logger_config import setup_logger
 
 logger = setup_logger()
 
+
+def is_smtp_unavailable(exc: Exception) -> bool:
+    # 5xx - постоянные ошибки (неверный логин, отказ в приеме), а не недоступность сервера
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return not 500 <= exc.smtp_code < 600
+    return isinstance(exc, OSError)
+
+
 class SMTPClient:
-    def __init__(self, smtp_server: str, smtp_port: int, email_user: str, email_password: str):
+    def __init__(self, smtp_server: str, smtp_port: int, email_user: str, email_password: str,
+                 connect_timeout: float = 10.0, read_timeout: float = 30.0, breaker: CircuitBreaker = None):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.email_user = email_user
         self.email_password = email_password
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker = breaker
 
     def get_connection(self):
-        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-        server.starttls()
-        server.login(self.email_user, self.email_password)
+        if self.breaker:
+            return self.breaker.call(self._connect)
+        return self._connect()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.connect_timeout)
+        try:
+            server.sock.settimeout(self.read_timeout)
+            server.starttls()
+            server.login(self.email_user, self.email_password)
+        except Exception:
+            server.close()
+            raise
         logger.info("SMTP соединение успешно")
         return server
\ No newline at end of file
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 from pydantic import BaseModel, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +14,11 @@ class JiraSettings(BaseModel):
     jira_external_url: str
     release_title_field_id: str | None = None
     change_field_id: str | None = None
+    jira_connect_timeout: float = 5.0
+    jira_read_timeout: float = 30.0
+    jira_cassette_mode: Literal['off', 'record', 'replay'] = 'off'
+    jira_cassette_path: str = str(ROOT_DIR / 'data' / 'jira_cassette.jsonl.gz')
+    jira_replay_latency: float | None = 0.0
 
 
 class SmtpSettings(BaseModel):
@@ -21,6 +26,8 @@ class SmtpSettings(BaseModel):
     smtp_port: int = 587
     email_user: str
     email_password: SecretStr
+    smtp_connect_timeout: float = 10.0
+    smtp_read_timeout: float = 30.0
 
 
 class EmailSettings(BaseModel):
@@ -51,6 +58,48 @@ class RedisSettings(BaseModel):
         return f'redis://{self.redis_host}:{self.redis_port}/0'
 
 
+class PollingSettings(BaseModel):
+    poll_min_interval: float = 20.0
+    poll_max_interval: float = 1800.0
+    poll_backoff_factor: float = 2.0
+    poll_pending_timeout: float = 900.0
+
+
+class CircuitBreakerSettings(BaseModel):
+    failure_threshold: int = 3
+    recovery_timeout: float = 60.0
+
+
+class OutboxSettings(BaseModel):
+    outbox_batch_size: int = 20
+    outbox_max_attempts: int = 5
+    outbox_drain_interval: float = 10.0
+    outbox_claim_idle_seconds: float = 120.0
+    outbox_idempotency_ttl: int = 7 * 24 * 3600
+    outbox_retry_delay: float = 60.0
+
+
+class DigestSettings(BaseModel):
+    digest_enabled: bool = True
+    digest_window: float = 300.0
+    digest_max_size: int = 50
+    digest_check_interval: float = 30.0
+
+
+class HealthSettings(BaseModel):
+    health_probe_interval: float = 30.0
+    health_stale_after: float = 90.0
+    health_host: str = '0.0.0.0'
+    health_port: int = 8081
+
+
+class SerializationSettings(BaseModel):
+    result_serializer: str = 'json'
+    compression: Literal['zlib', 'lz4', 'none'] = 'zlib'
+    compress_threshold: int = 1024
+    zlib_level: int = 6
+
+
 class ChangeMapping:
     MAPPING = {
         'New features': 'Новая функциональность',
@@ -83,6 +132,12 @@ class Settings(BaseSettings):
     project_settings: ProjectSettings
     report_settings: ReportSettings
     redis_settings: RedisSettings
+    polling_settings: PollingSettings = PollingSettings()
+    circuit_breaker_settings: CircuitBreakerSettings = CircuitBreakerSettings()
+    outbox_settings: OutboxSettings = OutboxSettings()
+    digest_settings: DigestSettings = DigestSettings()
+    serialization_settings: SerializationSettings = SerializationSettings()
+    health_settings: HealthSettings = HealthSettings()
 
 
 settings = Settings()
@@ -0,0 +1,70 @@
+import time
+from typing import Dict
+
+from .config import settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+
+class DigestBuffer:
+    """Копит события о выполненных задачах в Redis, чтобы отправить их одним письмом.
+
+    Повторные события по одной задаче схлопываются по ключу задачи. Буфер готов
+    к отправке, когда с первого события прошло window секунд или набралось
+    max_size задач.
+    """
+
+    def __init__(self, project_key: str, window: float = 300.0, max_size: int = 50, redis_client=None):
+        self.window = window
+        self.max_size = max_size
+        self.redis = redis_client or get_redis()
+        self.issues_key = make_key('digest', project_key, 'issues')
+        self.opened_key = make_key('digest', project_key, 'opened_at')
+
+    def add(self, issue_key: str, summary: str) -> bool:
+        pipe = self.redis.pipeline()
+        pipe.hset(self.issues_key, issue_key, summary)
+        pipe.set(self.opened_key, time.time(), nx=True)
+        pipe.execute()
+        return self.is_due()
+
+    def is_due(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self.opened_key)
+        pipe.hlen(self.issues_key)
+        opened_at, size = pipe.execute()
+
+        if opened_at is None or not size:
+            return False
+        return size >= self.max_size or now - float(opened_at) >= self.window
+
+    def take(self) -> Dict[str, str]:
+        pipe = self.redis.pipeline()
+        pipe.hgetall(self.issues_key)
+        pipe.delete(self.issues_key, self.opened_key)
+        issues, _ = pipe.execute()
+        return issues
+
+    def restore(self, issues: Dict[str, str]):
+        if not issues:
+            return
+        pipe = self.redis.pipeline()
+        pipe.hset(self.issues_key, mapping=issues)
+        pipe.set(self.opened_key, time.time(), nx=True)
+        pipe.execute()
+        logger.warning(f"Дайджест из {len(issues)} задач возвращен в буфер")
+
+    def size(self) -> int:
+        return self.redis.hlen(self.issues_key)
+
+
+def create_digest_buffer() -> DigestBuffer:
+    digest = settings.digest_settings
+    return DigestBuffer(
+        project_key=settings.jira_settings.jira_project_key,
+        window=digest.digest_window,
+        max_size=digest.digest_max_size
+    )
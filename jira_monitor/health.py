@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from smtplib import SMTPResponseException
+from typing import Any, Dict
+
+import requests
+
+from .config import settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+HEALTH_KEY = make_key('health')
+PROBES = ('smtp', 'jira')
+
+# SMTP-сессия переиспользуется между пробами в процессе воркера: проба - это NOOP, а не логин
+_smtp_session = None
+_smtp_lock = threading.Lock()
+
+
+def _probe_smtp(smtp_client):
+    global _smtp_session
+
+    with _smtp_lock:
+        if _smtp_session is not None:
+            try:
+                _noop(_smtp_session)
+                return
+            except Exception:
+                _close_smtp_session()
+
+        _smtp_session = smtp_client.get_connection()
+        try:
+            _noop(_smtp_session)
+        except Exception:
+            _close_smtp_session()
+            raise
+
+
+def _noop(session):
+    # noop() не бросает исключение на ответ сервера, код нужно проверить самим
+    code, message = session.noop()
+    if code != 250:
+        raise SMTPResponseException(code, message)
+
+
+def _close_smtp_session():
+    global _smtp_session
+    try:
+        _smtp_session.close()
+    except Exception:
+        pass
+    _smtp_session = None
+
+
+def _probe_jira():
+    jira = settings.jira_settings
+    response = requests.get(
+        f"{jira.jira_url.rstrip('/')}/rest/api/2/serverInfo",
+        timeout=(jira.jira_connect_timeout, jira.jira_read_timeout),
+        verify=False
+    )
+    response.raise_for_status()
+
+
+def _run_probe(name: str, probe, *args) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        probe(*args)
+        error = None
+    except Exception as e:
+        error = str(e)[:500]
+        logger.warning(f"Проба {name} неудачна: {error}")
+
+    return {
+        'ok': error is None,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+        'checked_at': time.time(),
+        'error': error,
+    }
+
+
+def run_probes(smtp_client, redis_client=None) -> Dict[str, Dict[str, Any]]:
+    """Выполняет дешевые пробы SMTP и Jira и сохраняет результаты в Redis."""
+    results = {
+        'smtp': _run_probe('smtp', _probe_smtp, smtp_client),
+        'jira': _run_probe('jira', _probe_jira),
+    }
+
+    redis_client = redis_client or get_redis()
+    redis_client.hset(HEALTH_KEY, mapping={name: json.dumps(result) for name, result in results.items()})
+    return results
+
+
+def read_health(redis_client=None, now: float = None) -> Dict[str, Any]:
+    """Отдает закешированные результаты проб без обращения к SMTP и Jira."""
+    now = time.time() if now is None else now
+    stale_after = settings.health_settings.health_stale_after
+    cached = (redis_client or get_redis()).hgetall(HEALTH_KEY)
+
+    probes = {}
+    for name in PROBES:
+        result = json.loads(cached[name]) if name in cached else {'ok': False, 'error': 'нет данных'}
+        result['age'] = round(now - result['checked_at'], 1) if 'checked_at' in result else None
+        result['stale'] = result['age'] is None or result['age'] > stale_after
+        probes[name] = result
+
+    return {
+        'ok': all(probe['ok'] and not probe['stale'] for probe in probes.values()),
+        'probes': probes,
+    }
+
+
+class HealthRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/health/live':
+            self._respond(200, {'ok': True})
+            return
+
+        if self.path in ('/health', '/health/ready'):
+            try:
+                health = read_health()
+            except Exception as e:
+                self._respond(503, {'ok': False, 'error': str(e)})
+                return
+            self._respond(200 if health['ok'] else 503, health)
+            return
+
+        self._respond(404, {'error': 'not found'})
+
+    def _respond(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Health: {format % args}")
+
+
+def serve_health(host: str = None, port: int = None):
+    health = settings.health_settings
+    server = ThreadingHTTPServer((host or health.health_host, port or health.health_port), HealthRequestHandler)
+    logger.info(f"Health endpoint запущен на {server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
@@ -1,6 +1,13 @@
+from typing import Tuple
+
+from .circuit_breaker import create_circuit_breaker
 from .clients import SMTPClient, JiraClient, EmailClient
+from .clients.jira_client import is_jira_unavailable
+from .clients.smtp_client import is_smtp_unavailable
 from .logger_config import setup_logger
+from .outbox import Outbox, create_outbox
 from .config import settings
+from .digest import DigestBuffer, create_digest_buffer
 
 logger = setup_logger()
 
@@ -11,20 +18,32 @@ def create_smtp_client() -> SMTPClient:
         smtp_server=smtp.smtp_server,
         smtp_port=smtp.smtp_port,
         email_user=smtp.email_user,
-        email_password=smtp.email_password.get_secret_value()
+        email_password=smtp.email_password.get_secret_value(),
+        connect_timeout=smtp.smtp_connect_timeout,
+        read_timeout=smtp.smtp_read_timeout,
+        breaker=create_circuit_breaker('smtp', is_failure=is_smtp_unavailable)
     )
 
 
-def create_jira_client() -> JiraClient:
+def create_jira_client(**options) -> JiraClient:
     jira = settings.jira_settings
     report = settings.report_settings
+    options = {
+        'cassette_mode': jira.jira_cassette_mode,
+        'cassette_path': jira.jira_cassette_path,
+        'replay_latency': jira.jira_replay_latency,
+        **options
+    }
     return JiraClient(
         jira_url=jira.jira_url,
         jira_token=jira.jira_token.get_secret_value(),
         project_key=jira.jira_project_key,
         report_day=report.report_day_of_month,
         report_hour=report.report_hour,
-        report_minute=report.report_minute
+        report_minute=report.report_minute,
+        timeout=(jira.jira_connect_timeout, jira.jira_read_timeout),
+        breaker=None if options['cassette_mode'] == 'replay' else create_circuit_breaker('jira', is_failure=is_jira_unavailable),
+        **options
     )
 
 
@@ -34,7 +53,7 @@ def create_email_client(smtp_client: SMTPClient, jira_client: JiraClient) -> Ema
 
     return EmailClient(
         smtp_client=smtp_client,
-        jira_client=jira_client.jira,
+        jira_client=jira_client,
         product_name=project.product_name,
         project_name=project.project_name,
         jira_external_url=jira.jira_external_url,
@@ -42,11 +61,27 @@ def create_email_client(smtp_client: SMTPClient, jira_client: JiraClient) -> Ema
     )
 
 
+def create_monitor(with_jira: bool = True, jira_client=None, outbox=None, use_outbox: bool = True,
+                   **jira_options) -> 'JiraCompletedMonitor':
+    smtp_client = create_smtp_client()
+    if jira_client is None and with_jira:
+        jira_client = create_jira_client(**jira_options)
+    email_client = create_email_client(smtp_client, jira_client)
+    digest = create_digest_buffer() if settings.digest_settings.digest_enabled else None
+    if outbox is None and use_outbox:
+        outbox = create_outbox()
+
+    return JiraCompletedMonitor(smtp_client, jira_client, email_client, outbox=outbox, digest=digest)
+
+
 class JiraCompletedMonitor:
-    def __init__(self, smtp_client: SMTPClient, jira_client: JiraClient, email_client: EmailClient):
+    def __init__(self, smtp_client: SMTPClient, jira_client: JiraClient, email_client: EmailClient,
+                 outbox: Outbox = None, digest: DigestBuffer = None):
         self.smtp_client = smtp_client
         self.jira_client = jira_client
         self.email_client = email_client
+        self.outbox = outbox
+        self.digest = digest
         self.jira_url = settings.jira_settings.jira_url
         self.project_key = settings.jira_settings.jira_project_key
 
@@ -68,8 +103,18 @@ class JiraCompletedMonitor:
             logger.error(f"Jira тест неудачен: {e}")
             jira_ok = False
 
+        for name, state in self.get_circuit_states().items():
+            logger.info(f"Circuit breaker {name}: {state['state']}, ошибок подряд: {state['failures']}")
+
         return smtp_ok and jira_ok
 
+    def get_circuit_states(self) -> dict:
+        states = {}
+        for name, client in (('smtp', self.smtp_client), ('jira', self.jira_client)):
+            if client is not None and client.breaker:
+                states[name] = client.breaker.describe()
+        return states
+
     def get_completed_issues(self):
         jira = settings.jira_settings
         return self.jira_client.filter_completed_issues(
@@ -77,6 +122,25 @@ class JiraCompletedMonitor:
             change_field_id=jira.change_field_id
         )
 
+    def run_report(self, is_startup: bool = False) -> Tuple[bool, str]:
+        """Тело задач проверки: поиск выполненных задач и постановка отчета в очередь."""
+        data, status_name = self.get_completed_issues()
+        if not data or status_name is None:
+            return False, "Ошибка получения задач из JIRA"
+
+        if not data['issues']:
+            logger.info("За указанный период задач не найдено")
+            return True, "За указанный период задач не найдено"
+
+        logger.info(f"Найдено {len(data['issues'])} задач за период")
+
+        if not self.send_batch_notification(data, is_startup=is_startup):
+            return False, "Ошибка отправки email"
+
+        if self.outbox:
+            return True, f"Отчет по {len(data['issues'])} задачам {self.outbox.report_status}"
+        return True, f"Отправлен отчет по {len(data['issues'])} задачам"
+
     def send_batch_notification(self, issues_data, is_startup=False):
         if not issues_data or not issues_data.get('issues'):
             logger.info("Нет задач для отправки")
@@ -91,6 +155,15 @@ class JiraCompletedMonitor:
             logger.info("Не удалось сформировать содержимое письма")
             return True
 
+        if self.outbox:
+            self.outbox.enqueue(
+                recipients=settings.email_settings.recipients_list,
+                subject=subject,
+                content=html_content,
+                subtype='html'
+            )
+            return True
+
         success = self.email_client.send_email(
             recipients=settings.email_settings.recipients_list,
             subject=subject,
@@ -104,21 +177,66 @@ class JiraCompletedMonitor:
             logger.error("Ошибка отправки email")
             return False
 
-    def send_simple_notification(self, issue_key: str, summary: str):
+    def send_simple_notification(self, issue_key: str, summary: str, immediate: bool = False):
+        if self.digest and not immediate:
+            if self.digest.add(issue_key, summary):
+                return self.flush_digest()
+            logger.info(f"Задача {issue_key} добавлена в дайджест")
+            return True
+
         subject, text_content = self.email_client.generate_simple_notification(
             issue_key=issue_key,
             summary=summary
         )
 
-        success = self.email_client.send_simple_email(
-            recipients=settings.email_settings.recipients_list,
-            subject=subject,
-            text_content=text_content
-        )
-
+        success = self._send_text(subject, text_content)
         if success:
             logger.info(f"Простое уведомление отправлено для задачи {issue_key}")
             return True
         else:
             logger.error(f"Ошибка отправки простого уведомления для задачи {issue_key}")
-            return False
\ No newline at end of file
+            return False
+
+    def flush_digest(self) -> bool:
+        issues = self.digest.take()
+        if not issues:
+            return True
+
+        if len(issues) == 1:
+            (issue_key, summary), = issues.items()
+            subject, text_content = self.email_client.generate_simple_notification(
+                issue_key=issue_key,
+                summary=summary
+            )
+        else:
+            subject, text_content = self.email_client.generate_digest_notification(issues)
+
+        try:
+            success = self._send_text(subject, text_content)
+        except Exception:
+            self.digest.restore(issues)
+            raise
+
+        if success:
+            logger.info(f"Дайджест отправлен по {len(issues)} задачам")
+            return True
+        else:
+            logger.error(f"Ошибка отправки дайджеста по {len(issues)} задачам")
+            self.digest.restore(issues)
+            return False
+
+    def _send_text(self, subject: str, text_content: str) -> bool:
+        if self.outbox:
+            self.outbox.enqueue(
+                recipients=settings.email_settings.recipients_list,
+                subject=subject,
+                content=text_content,
+                subtype='plain'
+            )
+            return True
+
+        return self.email_client.send_simple_email(
+            recipients=settings.email_settings.recipients_list,
+            subject=subject,
+            text_content=text_content
+        )
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import socket
+import time
+from smtplib import SMTPServerDisconnected
+from typing import Dict, List, Tuple
+
+from redis.exceptions import ResponseError, WatchError
+
+from .clients.email_generator import build_message
+from .config import settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+GROUP = 'sender'
+
+
+def make_idempotency_key(recipients: List[str], subject: str, content: str) -> str:
+    digest = hashlib.sha256()
+    for part in (','.join(recipients), subject, content):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Outbox:
+    """Очередь готовых писем в Redis Stream между формированием отчета и SMTP.
+
+    Отчет ставится в очередь один раз (по ключу идемпотентности), а отправитель
+    разбирает ее пачками через одну SMTP-сессию. Неотправленное письмо ждет
+    повтора в отложенном множестве с экспоненциальной паузой, а после
+    max_attempts попыток уходит в поток недоставленных.
+    """
+
+    report_status = 'поставлен в очередь отправки'
+
+    def __init__(self, smtp_client=None, redis_client=None, batch_size: int = 20, max_attempts: int = 5,
+                 claim_idle_seconds: float = 120.0, idempotency_ttl: int = 7 * 24 * 3600,
+                 retry_delay: float = 60.0):
+        self.smtp_client = smtp_client
+        self.redis = redis_client or get_redis()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.claim_idle_ms = int(claim_idle_seconds * 1000)
+        self.idempotency_ttl = idempotency_ttl
+        self.retry_delay = retry_delay
+        self.stream_key = make_key('outbox')
+        self.delayed_key = make_key('outbox', 'delayed')
+        self.dead_key = make_key('outbox', 'dead')
+        self.consumer = f'{socket.gethostname()}-{os.getpid()}'
+        self._group_ready = False
+
+    def _queued_key(self, idempotency_key: str) -> str:
+        return make_key('outbox', 'queued', idempotency_key)
+
+    def _sent_key(self, idempotency_key: str) -> str:
+        return make_key('outbox', 'sent', idempotency_key)
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            self.redis.xgroup_create(self.stream_key, GROUP, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    def enqueue(self, recipients: List[str], subject: str, content: str, subtype: str = 'html',
+                idempotency_key: str = None) -> bool:
+        idempotency_key = idempotency_key or make_idempotency_key(recipients, subject, content)
+
+        queued_key = self._queued_key(idempotency_key)
+        if not self.redis.set(queued_key, 1, nx=True, ex=self.idempotency_ttl):
+            logger.info(f"Письмо '{subject}' уже поставлено в очередь, пропускаю")
+            return False
+
+        try:
+            self._ensure_group()
+            self.redis.xadd(self.stream_key, {
+                'idempotency_key': idempotency_key,
+                'recipients': ','.join(recipients),
+                'subject': subject,
+                'content': content,
+                'subtype': subtype,
+                'attempts': 0,
+            })
+        except Exception:
+            # иначе письмо потеряно, а повторная постановка отклоняется как дубликат
+            self.redis.delete(queued_key)
+            raise
+        logger.info(f"Письмо '{subject}' поставлено в очередь отправки")
+        return True
+
+    def _read_batch(self) -> List[Tuple[str, Dict[str, str]]]:
+        self._ensure_group()
+
+        # сначала забираем письма, зависшие у упавшего или не подключившегося отправителя
+        _, messages, *_ = self.redis.xautoclaim(
+            self.stream_key, GROUP, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id='0-0', count=self.batch_size
+        )
+        messages = [(msg_id, fields) for msg_id, fields in messages if fields]
+
+        remaining = self.batch_size - len(messages)
+        if remaining > 0:
+            response = self.redis.xreadgroup(GROUP, self.consumer, {self.stream_key: '>'}, count=remaining)
+            for _, stream_messages in response or []:
+                messages.extend(stream_messages)
+
+        return messages
+
+    def _ack(self, msg_id: str):
+        pipe = self.redis.pipeline()
+        pipe.xack(self.stream_key, GROUP, msg_id)
+        pipe.xdel(self.stream_key, msg_id)
+        pipe.execute()
+
+    def _retry_or_dead_letter(self, msg_id: str, fields: Dict[str, str], error: Exception):
+        attempts = int(fields.get('attempts', 0)) + 1
+        fields = dict(fields, attempts=attempts, last_error=str(error)[:500])
+
+        if attempts >= self.max_attempts:
+            self.redis.xadd(self.dead_key, fields)
+            # недоставленный отчет можно поставить в очередь заново
+            self.redis.delete(self._queued_key(fields['idempotency_key']))
+            logger.error(f"Письмо '{fields['subject']}' не доставлено после {attempts} попыток: {error}")
+        else:
+            not_before = time.time() + self.retry_delay * 2 ** (attempts - 1)
+            fields['not_before'] = not_before
+            self.redis.zadd(self.delayed_key, {json.dumps(fields, ensure_ascii=False, sort_keys=True): not_before})
+            logger.warning(f"Письмо '{fields['subject']}' будет отправлено повторно (попытка {attempts}) "
+                           f"не раньше чем через {not_before - time.time():.0f} с: {error}")
+        self._ack(msg_id)
+
+    def _promote_due(self):
+        """Возвращает в поток письма, у которых истекла пауза перед повтором."""
+        for member in self.redis.zrangebyscore(self.delayed_key, '-inf', time.time(), start=0, num=self.batch_size):
+            # WATCH не дает двум отправителям вернуть одно письмо дважды
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(self.delayed_key)
+                    if pipe.zscore(self.delayed_key, member) is None:
+                        continue
+                    pipe.multi()
+                    pipe.zrem(self.delayed_key, member)
+                    pipe.xadd(self.stream_key, json.loads(member))
+                    pipe.execute()
+                except WatchError:
+                    continue
+
+    def drain(self) -> Dict[str, int]:
+        """Отправляет одну пачку писем. Ошибка соединения оставляет пачку в очереди."""
+        stats = {'sent': 0, 'skipped': 0, 'failed': 0, 'deferred': 0}
+
+        self._ensure_group()
+        self._promote_due()
+        messages = self._read_batch()
+        if not messages:
+            return stats
+
+        with self.smtp_client.get_connection() as server:
+            for index, (msg_id, fields) in enumerate(messages):
+                sent_key = self._sent_key(fields['idempotency_key'])
+                if self.redis.exists(sent_key):
+                    self._ack(msg_id)
+                    stats['skipped'] += 1
+                    continue
+
+                msg = build_message(
+                    self.smtp_client.email_user,
+                    fields['recipients'].split(','),
+                    fields['subject'],
+                    fields['content'],
+                    fields.get('subtype', 'html')
+                )
+                try:
+                    server.send_message(msg)
+                except SMTPServerDisconnected as e:
+                    # письма не виноваты: остаток пачки без подтверждения заберет следующий drain
+                    stats['deferred'] = len(messages) - index
+                    logger.warning(f"SMTP-сервер разорвал соединение, отправка пачки прервана: {e}")
+                    break
+                except Exception as e:
+                    self._retry_or_dead_letter(msg_id, fields, e)
+                    stats['failed'] += 1
+                    continue
+
+                self.redis.set(sent_key, 1, ex=self.idempotency_ttl)
+                self._ack(msg_id)
+                stats['sent'] += 1
+
+        logger.info(f"Очередь писем: отправлено {stats['sent']}, пропущено {stats['skipped']}, "
+                    f"ошибок {stats['failed']}, отложено {stats['deferred']}")
+        return stats
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            'queued': self.redis.xlen(self.stream_key),
+            'delayed': self.redis.zcard(self.delayed_key),
+            'dead': self.redis.xlen(self.dead_key),
+        }
+
+
+def create_outbox(smtp_client=None) -> Outbox:
+    outbox = settings.outbox_settings
+    return Outbox(
+        smtp_client=smtp_client,
+        batch_size=outbox.outbox_batch_size,
+        max_attempts=outbox.outbox_max_attempts,
+        claim_idle_seconds=outbox.outbox_claim_idle_seconds,
+        idempotency_ttl=outbox.outbox_idempotency_ttl,
+        retry_delay=outbox.outbox_retry_delay
+    )
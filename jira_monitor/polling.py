@@ -0,0 +1,98 @@
+import time
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+
+class AdaptivePoller:
+    """Решает, нужен ли полный опрос Jira, по дешевому пробному запросу.
+
+    Состояние (отпечаток проекта, текущий интервал, время следующей проверки)
+    хранится в Redis, поэтому переживает перезапуск beat.
+    """
+
+    def __init__(self, project_key: str, redis_client=None):
+        polling = settings.polling_settings
+        self.project_key = project_key
+        self.redis = redis_client or get_redis()
+        self.min_interval = polling.poll_min_interval
+        self.max_interval = polling.poll_max_interval
+        self.backoff_factor = polling.poll_backoff_factor
+        self.pending_timeout = polling.poll_pending_timeout
+        self.state_key = make_key('polling', project_key)
+
+    def get_state(self) -> Dict[str, str]:
+        return self.redis.hgetall(self.state_key)
+
+    def is_due(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        next_check_at = self.redis.hget(self.state_key, 'next_check_at')
+        return next_check_at is None or now >= float(next_check_at)
+
+    def check(self, jira_client, now: float = None) -> Optional[str]:
+        """Возвращает новый отпечаток, если нужна полная проверка, иначе None.
+
+        Отпечаток считается обработанным только после confirm(), до этого он
+        хранится как pending и повторно не запускает проверку. Pending старше
+        pending_timeout игнорируется: сообщение о проверке могло потеряться.
+        """
+        now = time.time() if now is None else now
+        state = self.get_state()
+
+        probe = jira_client.probe_changes()
+        fingerprint = f"{probe['period_start']}|{probe['total']}|{probe['last_updated']}"
+
+        pending = state.get('pending')
+        if pending and now - float(state.get('pending_at', 0)) >= self.pending_timeout:
+            logger.warning(f"Проверка изменений {pending} не завершилась за {self.pending_timeout:.0f} сек")
+            pending = None
+
+        if fingerprint in (state.get('fingerprint'), pending):
+            previous = float(state.get('interval', self.min_interval))
+            interval = min(previous * self.backoff_factor, self.max_interval)
+            logger.info(f"Изменений в проекте {self.project_key} нет, следующая проверка через {interval:.0f} сек")
+            changed = None
+        else:
+            interval = self.min_interval
+            logger.info(f"Обнаружены изменения в проекте {self.project_key}: {fingerprint}")
+            changed = fingerprint
+
+        mapping = {
+            'interval': interval,
+            'last_check_at': now,
+            'next_check_at': now + interval,
+        }
+        if changed:
+            mapping['pending'] = fingerprint
+            mapping['pending_at'] = now
+        self.redis.hset(self.state_key, mapping=mapping)
+        return changed
+
+    def confirm(self, fingerprint: str):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.state_key, 'fingerprint', fingerprint)
+        pipe.hdel(self.state_key, 'pending', 'pending_at')
+        pipe.execute()
+
+    def release(self, fingerprint: str):
+        """Снимает pending после неудачной проверки, чтобы следующая проба запустила ее снова."""
+        if self.redis.hget(self.state_key, 'pending') == fingerprint:
+            pipe = self.redis.pipeline()
+            pipe.hdel(self.state_key, 'pending', 'pending_at')
+            pipe.hset(self.state_key, mapping={'interval': self.min_interval, 'next_check_at': time.time()})
+            pipe.execute()
+
+    def reset(self):
+        self.redis.delete(self.state_key)
+
+    def describe(self) -> Dict[str, Any]:
+        state = self.get_state()
+        return {
+            'fingerprint': state.get('fingerprint'),
+            'interval': float(state['interval']) if 'interval' in state else None,
+            'next_check_at': float(state['next_check_at']) if 'next_check_at' in state else None,
+        }
@@ -0,0 +1,274 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from .clients.cassette import load_cassette
+from .config import ROOT_DIR, settings
+from .logger_config import setup_logger
+from .redis_store import get_redis, make_key
+
+logger = setup_logger()
+
+PROFILE_DIR = ROOT_DIR / 'logs' / 'profile'
+SAMPLING_KEY = make_key('profiling', 'sampling')
+
+
+class StackSampler:
+    """Периодически снимает стек потока и копит его в формате collapsed stacks
+    (строки вида "a;b;c 42"), который понимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: Path, append: bool = False):
+        with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class NullOutbox:
+    """Вместо постановки письма в очередь только пишет в лог - отправка отключена."""
+
+    report_status = 'сформирован, отправка отключена'
+
+    def enqueue(self, recipients, subject: str, content: str, subtype: str = 'html',
+                idempotency_key: str = None) -> bool:
+        logger.info(f"Отправка отключена при профилировании: {subject}")
+        return True
+
+
+class OfflineJiraClient:
+    """Подменяет Jira, когда задачи берутся из файла: версий релиза нет."""
+
+    breaker = None
+
+    def __init__(self, issues_data: Dict[str, Any]):
+        self.issues_data = issues_data
+
+    def filter_completed_issues(self, release_title_field_id: str = None, change_field_id: str = None):
+        return self.issues_data, "Готово"
+
+    def project(self, project_key: str):
+        return project_key
+
+    def project_versions(self, project):
+        return []
+
+
+def load_issues(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        jira = settings.jira_settings
+        data = {
+            'issues': data,
+            'total': len(data),
+            'release_title_field_id': jira.release_title_field_id,
+            'change_field_id': jira.change_field_id
+        }
+    return data
+
+
+def run_report_cycle(issues_data: Dict[str, Any] = None, send: bool = False,
+                     jira_options: Dict[str, Any] = None) -> Tuple[str, Any]:
+    """Тот же JiraCompletedMonitor.run_report, что выполняет check_jira_tasks, но без Celery.
+
+    Без send письмо не отправляется, с send - отправляется сразу, минуя общую очередь писем,
+    чтобы не разбирать письма рабочего воркера. jira_options передаются в create_jira_client,
+    например режим кассеты.
+    """
+    from .jira_monitor import create_monitor
+
+    jira_client = OfflineJiraClient(issues_data) if issues_data is not None else None
+    outbox = None if send else NullOutbox()
+    monitor = create_monitor(jira_client=jira_client, outbox=outbox, use_outbox=not send,
+                             **(jira_options or {}))
+
+    _, message = monitor.run_report(is_startup=False)
+    return message, monitor.jira_client
+
+
+def _preload_cassette(jira_options: Dict[str, Any] = None) -> Dict[str, Any]:
+    jira_options = dict(jira_options or {})
+    if jira_options.get('cassette_mode') == 'replay' and 'cassette_interactions' not in jira_options:
+        jira_options['cassette_interactions'] = load_cassette(jira_options['cassette_path'])
+    return jira_options
+
+
+def time_report_cycles(issues_from: str = None, send: bool = False, jira_options: Dict[str, Any] = None,
+                       repeat: int = 1) -> Dict[str, Any]:
+    """Замер циклов отчета без профилировщиков - для сравнения пропускной способности до и после изменений."""
+    issues_data = load_issues(issues_from) if issues_from else None
+    jira_options = _preload_cassette(jira_options)
+    jira_calls = Counter()
+    durations = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result, jira_client = run_report_cycle(issues_data=issues_data, send=send, jira_options=jira_options)
+        durations.append(time.perf_counter() - started)
+
+        transport = getattr(jira_client, 'transport', None)
+        if transport is not None:
+            jira_calls.update(transport.calls)
+
+    elapsed = sum(durations)
+    durations.sort()
+    return {
+        'result': result,
+        'elapsed': elapsed,
+        'cycles_per_second': repeat / elapsed if elapsed else None,
+        'latency_ms': {
+            'min': durations[0] * 1000,
+            'median': durations[len(durations) // 2] * 1000,
+            'p95': durations[min(int(len(durations) * 0.95), len(durations) - 1)] * 1000,
+            'max': durations[-1] * 1000,
+        },
+        'jira_calls': dict(jira_calls),
+    }
+
+
+def profile_report_cycle(issues_from: str = None, send: bool = False, output_dir: Path = None,
+                         top: int = 30, jira_options: Dict[str, Any] = None, repeat: int = 1) -> Dict[str, Any]:
+    output_dir = Path(output_dir or PROFILE_DIR / datetime.now().strftime('%Y%m%d-%H%M%S'))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    issues_data = load_issues(issues_from) if issues_from else None
+    jira_options = _preload_cassette(jira_options)
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+    jira_calls = Counter()
+
+    tracemalloc.start(25)
+    sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        for _ in range(repeat):
+            result, jira_client = run_report_cycle(issues_data=issues_data, send=send, jira_options=jira_options)
+            transport = getattr(jira_client, 'transport', None)
+            if transport is not None:
+                jira_calls.update(transport.calls)
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    profiler.dump_stats(output_dir / 'cycle.prof')
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+    (output_dir / 'hot_functions.txt').write_text(stream.getvalue(), encoding='utf-8')
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    with open(output_dir / 'allocations.txt', 'w', encoding='utf-8') as f:
+        f.write(f"Пиковое потребление памяти: {peak / 1024:.1f} KiB\n\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            f.write(f"{stat}\n")
+
+    sampler.write_collapsed(output_dir / 'stacks.collapsed')
+
+    return {
+        'result': result,
+        'elapsed': elapsed,
+        'jira_calls': dict(jira_calls),
+        'peak_memory': peak,
+        'output_dir': str(output_dir),
+    }
+
+
+# Флаг кешируется в процессе: задачи выполняются в дочерних процессах пула, до которых команда
+# управления не доходит, поэтому они перечитывают его из Redis не чаще раза в SAMPLING_CACHE_TTL
+SAMPLING_CACHE_TTL = 5.0
+_sampling = {'enabled': False, 'checked_at': None}
+
+
+def set_sampling(enabled: bool):
+    if enabled:
+        get_redis().set(SAMPLING_KEY, 1)
+    else:
+        get_redis().delete(SAMPLING_KEY)
+    _sampling.update(enabled=enabled, checked_at=time.monotonic())
+
+
+def is_sampling_enabled() -> bool:
+    now = time.monotonic()
+    if _sampling['checked_at'] is None or now - _sampling['checked_at'] >= SAMPLING_CACHE_TTL:
+        _sampling.update(enabled=bool(get_redis().exists(SAMPLING_KEY)), checked_at=now)
+    return _sampling['enabled']
+
+
+_task_samplers: Dict[str, StackSampler] = {}
+
+
+def start_task_sampling(task_id: str):
+    """Запускает семплирование задачи воркера, если режим включен командой управления."""
+    try:
+        if not is_sampling_enabled():
+            return
+    except Exception as e:
+        logger.error(f"Не удалось проверить режим семплирования: {e}")
+        return
+
+    sampler = StackSampler()
+    sampler.start()
+    _task_samplers[task_id] = sampler
+
+
+def stop_task_sampling(task_id: str):
+    """Останавливает семплирование и дописывает стеки в logs/profile/worker-<pid>.collapsed."""
+    sampler = _task_samplers.pop(task_id, None)
+    if sampler is None:
+        return
+
+    sampler.stop()
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    sampler.write_collapsed(PROFILE_DIR / f'worker-{os.getpid()}.collapsed', append=True)
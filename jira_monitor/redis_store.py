@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+import redis
+
+from .config import settings
+
+KEY_PREFIX = 'jira_monitor'
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.redis_settings.redis_url, decode_responses=True)
+
+
+def make_key(*parts: str) -> str:
+    return ':'.join((KEY_PREFIX,) + tuple(str(part) for part in parts))
@@ -0,0 +1,128 @@
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict
+
+import msgpack
+from kombu.serialization import dumps as kombu_dumps, loads as kombu_loads, register
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+from .config import settings
+from .redis_store import make_key
+
+SERIALIZER_NAME = 'msgpack-z'
+CONTENT_TYPE = 'application/x-msgpack-z'
+
+# первый байт сообщения - способ сжатия
+RAW = b'\x00'
+ZLIB = b'\x01'
+LZ4 = b'\x02'
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Тип {type(obj).__name__} не поддерживается msgpack")
+
+
+def dumps(obj: Any) -> bytes:
+    serialization = settings.serialization_settings
+    packed = msgpack.packb(obj, use_bin_type=True, default=_default)
+
+    if len(packed) < serialization.compress_threshold or serialization.compression == 'none':
+        return RAW + packed
+    if serialization.compression == 'lz4' and lz4 is not None:
+        return LZ4 + lz4.frame.compress(packed)
+    return ZLIB + zlib.compress(packed, serialization.zlib_level)
+
+
+def loads(data: bytes) -> Any:
+    if isinstance(data, str):
+        data = data.encode('latin-1')
+
+    header, body = data[:1], data[1:]
+    if header == ZLIB:
+        body = zlib.decompress(body)
+    elif header == LZ4:
+        if lz4 is None:
+            raise ValueError("Сообщение сжато lz4, но пакет lz4 не установлен")
+        body = lz4.frame.decompress(body)
+    elif header != RAW:
+        raise ValueError(f"Неизвестный формат сообщения: {header!r}")
+
+    return msgpack.unpackb(body, raw=False)
+
+
+def register_serializer():
+    register(SERIALIZER_NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding='binary')
+
+
+def make_sample_payload(issue_count: int = 500) -> Dict[str, Any]:
+    """Полезная нагрузка того же вида, что возвращает JiraClient.filter_completed_issues."""
+    changes = ['New features', 'Functionality update', 'Performance enhancements', 'Bug fixes', 'Other changes']
+    issues = [
+        {
+            'key': f'PRJ-{i}',
+            'fields': {
+                'summary': f'Задача номер {i}: доработка отчета и исправление ошибок',
+                'assignee': f'Исполнитель {i % 17}',
+                'updated': f'2024-05-{i % 28 + 1:02d}T12:{i % 60:02d}:00.000+0300',
+                'status': 'Done',
+                'customfield_10100': f'Улучшен экспорт отчетов, вариант {i}',
+                'customfield_10200': {'value': changes[i % len(changes)]},
+            }
+        }
+        for i in range(issue_count)
+    ]
+    return {
+        'issues': issues,
+        'total': issue_count,
+        'release_title_field_id': 'customfield_10100',
+        'change_field_id': 'customfield_10200'
+    }
+
+
+def benchmark(payload: Any, rounds: int = 200, redis_client=None) -> Dict[str, Dict[str, float]]:
+    """Сравнивает время кодирования/декодирования и размер в Redis для JSON и msgpack-z.
+
+    Оба варианта идут через kombu, как при передаче задач и результатов Celery.
+    """
+    register_serializer()
+
+    results = {}
+    for name in ('json', SERIALIZER_NAME):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            content_type, content_encoding, encoded = kombu_dumps(payload, serializer=name)
+        encode_time = (time.perf_counter() - started) / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            kombu_loads(encoded, content_type, content_encoding, accept=[content_type])
+        decode_time = (time.perf_counter() - started) / rounds
+
+        if isinstance(encoded, str):
+            encoded = encoded.encode('utf-8')
+        results[name] = {
+            'encode_ms': encode_time * 1000,
+            'decode_ms': decode_time * 1000,
+            'bytes': len(encoded),
+            'redis_bytes': _redis_memory_usage(redis_client, name, encoded),
+        }
+    return results
+
+
+def _redis_memory_usage(redis_client, name: str, encoded: bytes):
+    if redis_client is None:
+        return None
+
+    key = make_key('bench', name)
+    try:
+        redis_client.set(key, encoded, ex=60)
+        return redis_client.memory_usage(key)
+    finally:
+        redis_client.delete(key)
@@ -1,73 +1,165 @@
 from celery_app import app
+from celery.signals import task_prerun, task_postrun
+from celery.worker.control import control_command
 from datetime import datetime
 
+from .circuit_breaker import CircuitOpenError, create_circuit_breaker
 from .config import settings
-from .jira_monitor import JiraCompletedMonitor, create_smtp_client, create_jira_client, create_email_client
+from .digest import create_digest_buffer
+from .health import run_probes
+from .jira_monitor import create_monitor, create_smtp_client, create_jira_client
 from .logger_config import setup_logger
+from .outbox import create_outbox
+from .polling import AdaptivePoller
+from .profiling import set_sampling, start_task_sampling, stop_task_sampling
 
 logger = setup_logger()
 
+
+@task_prerun.connect
+def on_task_prerun(task_id=None, **kwargs):
+    start_task_sampling(task_id)
+
+
+@task_postrun.connect
+def on_task_postrun(task_id=None, **kwargs):
+    stop_task_sampling(task_id)
+
+
+@control_command(args=[('enabled', int)], signature='<enabled>')
+def jira_sampling(state, enabled=1):
+    set_sampling(bool(enabled))
+    return {'ok': 'семплирование включено' if enabled else 'семплирование выключено'}
+
+
+def _finish_poll(fingerprint: str, success: bool):
+    if not fingerprint:
+        return
+    poller = AdaptivePoller(settings.jira_settings.jira_project_key)
+    if success:
+        poller.confirm(fingerprint)
+    else:
+        poller.release(fingerprint)
+
+
 @app.task(bind=True, max_retries=3)
-def check_jira_tasks(self):
+def check_jira_tasks(self, fingerprint: str = None):
     try:
-        smtp_client = create_smtp_client()
-        jira_client = create_jira_client()
-        email_client = create_email_client(smtp_client, jira_client)
-        monitor = JiraCompletedMonitor(smtp_client, jira_client, email_client)
+        monitor = create_monitor()
 
         logger.info("Отправка ежемесячного отчета...")
 
-        data, status_name = monitor.get_completed_issues()
-        if not data:
-            return "JIRA недоступна"
+        success, message = monitor.run_report(is_startup=False)
+        _finish_poll(fingerprint, success=success)
+        if success:
+            send_outbox.delay()
+        return message
 
-        if data['issues']:
-            logger.info(f"Найдено {len(data['issues'])} задач за период")
-
-            success = monitor.send_batch_notification(data, is_startup=False)
-            if success:
-                return f"Отправлен ежемесячный отчет по {len(data['issues'])} задачам"
-            else:
-                return "Ошибка отправки email"
-        else:
-            logger.info("За указанный период задач не найдено")
-            return "За указанный период задач не найдено"
+    except CircuitOpenError as exc:
+        logger.warning(f"Проверка пропущена: {exc}")
+        _finish_poll(fingerprint, success=False)
+        return str(exc)
 
     except Exception as exc:
         logger.error(f"Ошибка в задаче: {exc}")
+        if self.request.retries >= self.max_retries:
+            _finish_poll(fingerprint, success=False)
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
+@app.task
+def poll_jira_tasks():
+    try:
+        poller = AdaptivePoller(settings.jira_settings.jira_project_key)
+        if not poller.is_due():
+            return "Проверка отложена"
+
+        # клиент нужен только для пробы, serverInfo при создании лишь удвоил бы число запросов
+        jira_client = create_jira_client(get_server_info=False)
+        fingerprint = poller.check(jira_client)
+        if fingerprint:
+            check_jira_tasks.delay(fingerprint=fingerprint)
+            return "Обнаружены изменения, запущена полная проверка"
+        return "Изменений нет"
+
+    except CircuitOpenError as e:
+        return str(e)
+
+    except Exception as e:
+        logger.error(f"Ошибка пробной проверки: {e}")
+        return f"Ошибка: {e}"
+
+
 @app.task(bind=True, max_retries=2)
 def startup_check_jira_tasks(self):
     try:
-        smtp_client = create_smtp_client()
-        jira_client = create_jira_client()
-        email_client = create_email_client(smtp_client, jira_client)
-        monitor = JiraCompletedMonitor(smtp_client, jira_client, email_client)
+        monitor = create_monitor()
 
         logger.info("Стартовая проверка отчета...")
 
-        data, status_name = monitor.get_completed_issues()
-        if not data:
-            return "JIRA недоступна при запуске"
-
-        if data['issues']:
-            logger.info(f"При запуске найдено {len(data['issues'])} задач за период")
+        success, message = monitor.run_report(is_startup=True)
+        if success:
+            send_outbox.delay()
+        return f"При запуске: {message}"
 
-            success = monitor.send_batch_notification(data, is_startup=True)
-            if success:
-                return f"Отправлен стартовый отчет по {len(data['issues'])} задачам"
-            return "Ошибка стартовой отправки"
-        else:
-            logger.info("При запуске за указанный период задач не найдено")
-            return "При запуске за указанный период задач не найдено"
+    except CircuitOpenError as exc:
+        logger.warning(f"Стартовая проверка пропущена: {exc}")
+        return str(exc)
 
     except Exception as exc:
         logger.error(f"Ошибка стартовой задачи: {exc}")
         raise self.retry(exc=exc, countdown=30)
 
 
+@app.task
+def send_outbox():
+    try:
+        outbox = create_outbox(create_smtp_client())
+        stats = outbox.drain()
+        # полная пачка без ошибок - в очереди могут остаться письма, повторные попытки ждут beat
+        if not stats['failed'] and not stats['deferred'] and sum(stats.values()) >= outbox.batch_size:
+            send_outbox.delay()
+        return stats
+
+    except CircuitOpenError as exc:
+        logger.warning(f"Отправка писем отложена: {exc}")
+        return str(exc)
+
+    except Exception as exc:
+        logger.error(f"Ошибка отправки очереди писем: {exc}")
+        return f"Ошибка: {exc}"
+
+
+@app.task
+def flush_digest():
+    try:
+        if not create_digest_buffer().is_due():
+            return "Дайджест еще не готов"
+
+        monitor = create_monitor(with_jira=False)
+        if monitor.digest is None:
+            return "Дайджест отключен"
+
+        if monitor.flush_digest():
+            send_outbox.delay()
+            return "Дайджест поставлен в очередь отправки"
+        return "Ошибка отправки дайджеста"
+
+    except Exception as e:
+        logger.error(f"Ошибка отправки дайджеста: {e}")
+        return f"Ошибка: {e}"
+
+
+@app.task
+def run_health_probes():
+    try:
+        results = run_probes(create_smtp_client())
+        return {name: result['ok'] for name, result in results.items()}
+    except Exception as e:
+        logger.error(f"Ошибка проверки состояния: {e}")
+        return f"Ошибка: {e}"
+
+
 @app.task
 def reset_notifications():
     try:
@@ -80,14 +172,24 @@ def reset_notifications():
 
 @app.task
 def get_status():
+    return collect_status()
+
+
+def collect_status() -> dict:
+    """Статус из настроек и Redis, без обращения к Jira и SMTP - годится и без воркера."""
     try:
         jira = settings.jira_settings
         email = settings.email_settings
+        polling = AdaptivePoller(jira.jira_project_key).describe()
 
         return {
             'jira_url': jira.jira_url,
             'project_key': jira.jira_project_key,
             'recipients': email.recipients_list,
+            'polling_interval': polling['interval'],
+            'circuits': {name: create_circuit_breaker(name).describe() for name in ('jira', 'smtp')},
+            'outbox': create_outbox().describe(),
+            'digest_size': create_digest_buffer().size(),
             'timestamp': datetime.now().isoformat(),
             'status': 'Система отправляет периодические отчеты за указанный период'
         }
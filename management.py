@@ -22,6 +22,13 @@ def main():
   reset     - Сбросить все уведомления
   status    - Показать статус системы
   both      - Запустить и worker и beat одновременно
+  health-server - Запустить HTTP endpoint /health/live и /health/ready
+  bench     - Сравнить JSON и msgpack-z на полезной нагрузке с задачами
+              [--issues-from FILE] [--issues N] [--rounds N]
+  profile   - Профилировать один цикл отчета
+              [--issues-from FILE] [--send] [--output DIR] [--sampling on|off]
+              [--record FILE | --replay FILE [--latency SEC|recorded]] [--repeat N] [--timing-only]
+  anonymize-cassette SRC DST - Обезличить кассету Jira перед передачей
   чтобы все было збс
         """)
         return
@@ -48,17 +55,137 @@ def main():
         print(result.get())
 
     elif command == "status":
-        print("Получение статуса...")
-        from jira_monitor.tasks import get_status
-        result = get_status.delay()
-        status = result.get()
+        from jira_monitor.health import read_health
+        health = read_health()
+        print(f"Состояние сервисов: {'OK' if health['ok'] else 'ЕСТЬ ПРОБЛЕМЫ'}")
+        for name, probe in health['probes'].items():
+            state = 'OK' if probe['ok'] else f"ошибка: {probe.get('error')}"
+            age = f"{probe['age']} сек назад" if probe['age'] is not None else 'не проверялся'
+            print(f"   - {name}: {state}, задержка {probe.get('latency_ms', 'N/A')} мс, {age}"
+                  f"{' (устарело)' if probe['stale'] else ''}")
+
+        from jira_monitor.tasks import collect_status
+        status = collect_status()
+        if 'error' in status:
+            print(f"Ошибка получения статуса: {status['error']}")
+            return
+        circuits = "\n".join(
+            f"   - Circuit breaker {name}: {state['state']} (ошибок: {state['failures']})"
+            for name, state in status.get('circuits', {}).items()
+        )
         print(f"""
 Статус системы:
    - Отправлено уведомлений: {status.get('sent_notifications', 'N/A')}
    - Обработано задач: {status.get('processed_issues', 'N/A')}
+   - Интервал опроса Jira: {status.get('polling_interval') or 'N/A'} сек
+{circuits}
+   - Писем в очереди: {status.get('outbox', {}).get('queued', 'N/A')}, ждут повтора: {status.get('outbox', {}).get('delayed', 'N/A')}, недоставлено: {status.get('outbox', {}).get('dead', 'N/A')}
+   - Задач в дайджесте: {status.get('digest_size', 'N/A')}
    - Время: {status.get('timestamp', 'N/A')}
         """)
 
+    elif command == "bench":
+        import argparse
+        parser = argparse.ArgumentParser(prog='management.py bench')
+        parser.add_argument('--issues-from', help='JSON с задачами вместо синтетических')
+        parser.add_argument('--issues', type=int, default=500, help='Число синтетических задач')
+        parser.add_argument('--rounds', type=int, default=200)
+        args = parser.parse_args(sys.argv[2:])
+
+        from jira_monitor.profiling import load_issues
+        from jira_monitor.redis_store import get_redis
+        from jira_monitor.serialization import benchmark, make_sample_payload
+
+        payload = load_issues(args.issues_from) if args.issues_from else make_sample_payload(args.issues)
+        try:
+            redis_client = get_redis()
+            redis_client.ping()
+        except Exception as e:
+            print(f"Redis недоступен, размер в Redis не измеряется: {e}")
+            redis_client = None
+
+        results = benchmark(payload, rounds=args.rounds, redis_client=redis_client)
+        print(f"\nЗадач в нагрузке: {len(payload['issues'])}")
+        for name, stats in results.items():
+            print(f"   - {name:10} кодирование {stats['encode_ms']:.3f} мс, декодирование {stats['decode_ms']:.3f} мс, "
+                  f"{stats['bytes']} байт, в Redis: {stats['redis_bytes'] or 'N/A'}")
+
+    elif command == "profile":
+        import argparse
+        parser = argparse.ArgumentParser(prog='management.py profile')
+        parser.add_argument('--issues-from', help='JSON с задачами вместо поиска в Jira')
+        parser.add_argument('--send', action='store_true', help='Реально отправить письмо напрямую, минуя очередь писем')
+        parser.add_argument('--output', help='Каталог для отчетов профилирования')
+        parser.add_argument('--sampling', choices=['on', 'off'],
+                            help='Переключить семплирование на работающих воркерах')
+        cassette_group = parser.add_mutually_exclusive_group()
+        cassette_group.add_argument('--record', help='Записать ответы Jira в кассету')
+        cassette_group.add_argument('--replay', help='Воспроизвести ответы Jira из кассеты')
+        parser.add_argument('--latency', default='0',
+                            help='Задержка ответа при воспроизведении, сек, или recorded')
+        parser.add_argument('--repeat', type=int, default=1, help='Число циклов отчета')
+        parser.add_argument('--timing-only', action='store_true',
+                            help='Только замер времени циклов, без cProfile/tracemalloc/семплера')
+        args = parser.parse_args(sys.argv[2:])
+
+        jira_options = {}
+        if args.record:
+            jira_options = {'cassette_mode': 'record', 'cassette_path': args.record}
+        elif args.replay:
+            latency = None if args.latency == 'recorded' else float(args.latency)
+            jira_options = {'cassette_mode': 'replay', 'cassette_path': args.replay, 'replay_latency': latency}
+
+        if args.sampling:
+            replies = app.control.broadcast('jira_sampling', arguments={'enabled': int(args.sampling == 'on')},
+                                            reply=True)
+            print(f"Ответы воркеров: {replies}")
+            return
+
+        if args.timing_only:
+            print("Замер циклов отчета...")
+            from jira_monitor.profiling import time_report_cycles
+            report = time_report_cycles(issues_from=args.issues_from, send=args.send,
+                                        jira_options=jira_options, repeat=args.repeat)
+            latency = report['latency_ms']
+            jira_calls = "\n".join(f"     {count:5d}  {key}" for key, count in sorted(report['jira_calls'].items()))
+            print(f"""
+Результат: {report['result']}
+   - Циклов: {args.repeat}, в секунду: {report['cycles_per_second']:.2f}
+   - Время цикла, мс: min {latency['min']:.1f}, median {latency['median']:.1f}, p95 {latency['p95']:.1f}, max {latency['max']:.1f}
+   - Запросов к Jira: {sum(report['jira_calls'].values()) if report['jira_calls'] else 'N/A'}
+{jira_calls}
+            """)
+            return
+
+        print("Профилирование цикла отчета...")
+        from jira_monitor.profiling import profile_report_cycle
+        report = profile_report_cycle(issues_from=args.issues_from, send=args.send, output_dir=args.output,
+                                      jira_options=jira_options, repeat=args.repeat)
+        jira_calls = "\n".join(f"     {count:5d}  {key}" for key, count in sorted(report['jira_calls'].items()))
+        print(f"""
+Результат: {report['result']}
+   - Время выполнения под профилировщиком: {report['elapsed']:.3f} сек
+   - Пик памяти: {report['peak_memory'] / 1024:.1f} KiB
+   - Отчеты: {report['output_dir']}
+   - Запросов к Jira: {sum(report['jira_calls'].values()) if report['jira_calls'] else 'N/A'}
+{jira_calls}
+        """)
+
+    elif command == "anonymize-cassette":
+        if len(sys.argv) < 4:
+            print("Использование: python management.py anonymize-cassette SRC DST")
+            return
+
+        from jira_monitor.clients.cassette import anonymize_cassette
+        from jira_monitor.config import settings
+        total, anonymized = anonymize_cassette(sys.argv[2], sys.argv[3], base_url=settings.jira_settings.jira_url)
+        print(f"Обезличено ответов: {anonymized} из {total}, результат: {sys.argv[3]}")
+
+    elif command == "health-server":
+        print("Запуск health endpoint...")
+        from jira_monitor.health import serve_health
+        serve_health()
+
     elif command == "both":
         print("Запуск Worker и Beat одновременно...")
         import subprocess
@@ -70,11 +197,16 @@ def main():
         def run_beat():
             subprocess.run([sys.executable, "management.py", "beat"])
 
+        def run_health_server():
+            subprocess.run([sys.executable, "management.py", "health-server"])
+
         worker_thread = threading.Thread(target=run_worker)
         beat_thread = threading.Thread(target=run_beat)
+        health_thread = threading.Thread(target=run_health_server, daemon=True)
 
         worker_thread.start()
         beat_thread.start()
+        health_thread.start()
 
         try:
             worker_thread.join()
@@ -0,0 +1,38 @@
+import os
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('JIRA_SETTINGS__JIRA_URL', 'http://jira.test')
+os.environ.setdefault('JIRA_SETTINGS__JIRA_TOKEN', 'token')
+os.environ.setdefault('JIRA_SETTINGS__JIRA_PROJECT_KEY', 'PRJ')
+os.environ.setdefault('JIRA_SETTINGS__JIRA_EXTERNAL_URL', 'http://jira.test')
+os.environ.setdefault('SMTP_SETTINGS__SMTP_SERVER', 'smtp.test')
+os.environ.setdefault('SMTP_SETTINGS__EMAIL_USER', 'bot@test')
+os.environ.setdefault('SMTP_SETTINGS__EMAIL_PASSWORD', 'secret')
+os.environ.setdefault('EMAIL_SETTINGS__EMAIL_RECIPIENTS', 'a@test,b@test')
+os.environ.setdefault('PROJECT_SETTINGS__PRODUCT_NAME', 'Product')
+os.environ.setdefault('PROJECT_SETTINGS__PROJECT_NAME', 'Project')
+os.environ.setdefault('REPORT_SETTINGS__REPORT_DAY_OF_MONTH', '1')
+os.environ.setdefault('REPORT_SETTINGS__REPORT_HOUR', '9')
+os.environ.setdefault('REPORT_SETTINGS__REPORT_MINUTE', '0')
+os.environ.setdefault('REDIS_SETTINGS__REDIS_HOST', 'localhost')
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время для модулей, которые берут time.time()."""
+    import time
+
+    current = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: current[0])
+    return current
@@ -0,0 +1,86 @@
+import gzip
+import json
+
+import pytest
+import requests
+
+from jira_monitor.clients.cassette import (
+    ANONYMIZED_URL, CassetteMissError, ReplayAdapter, anonymize_cassette, load_cassette, request_key
+)
+
+
+def interaction(key, body, status=200):
+    return {'key': key, 'status': status, 'content_type': 'application/json', 'body': json.dumps(body),
+            'elapsed': 0.5}
+
+
+def write_cassette(path, interactions):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for item in interactions:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+
+@pytest.fixture
+def session():
+    def mount(interactions):
+        client = requests.Session()
+        adapter = ReplayAdapter(interactions=interactions, latency=0)
+        client.mount('http://jira.test', adapter)
+        return client, adapter
+    return mount
+
+
+def test_request_key_ignores_host_and_query_order():
+    assert request_key('get', 'http://jira.test/rest/api/2/search?b=2&a=1') == \
+        request_key('GET', 'https://other.host/rest/api/2/search?a=1&b=2')
+    assert request_key('GET', 'http://jira.test/rest/api/2/search?a=1&b=2') == 'GET /rest/api/2/search?a=1&b=2'
+
+
+def test_request_key_hashes_body():
+    first = request_key('POST', 'http://jira.test/rest/api/2/search', '{"jql": "a"}')
+    same = request_key('POST', 'http://jira.test/rest/api/2/search', b'{"jql": "a"}')
+    other = request_key('POST', 'http://jira.test/rest/api/2/search', '{"jql": "b"}')
+
+    assert first == same
+    assert first != other
+    assert first.startswith('POST /rest/api/2/search #')
+
+
+def test_replay_returns_repeated_responses_in_order(session):
+    key = 'GET /rest/api/2/myself'
+    client, adapter = session([interaction(key, {'n': 1}), interaction(key, {'n': 2})])
+
+    answers = [client.get('http://jira.test/rest/api/2/myself').json()['n'] for _ in range(3)]
+
+    # последний ответ повторяется
+    assert answers == [1, 2, 2]
+    assert adapter.calls == {key: 3}
+
+
+def test_replay_miss_raises(session):
+    client, _ = session([interaction('GET /rest/api/2/myself', {})])
+
+    with pytest.raises(CassetteMissError):
+        client.get('http://jira.test/rest/api/2/serverInfo')
+
+
+def test_anonymize_cassette_replaces_users_and_base_url(tmp_path):
+    src, dst = tmp_path / 'src.jsonl.gz', tmp_path / 'dst.jsonl.gz'
+    user = {'displayName': 'Иван Петров', 'emailAddress': 'ivan@corp.test', 'name': 'ipetrov',
+            'avatarUrls': {'48x48': 'https://jira.corp.test/avatar.png'}}
+    write_cassette(src, [
+        interaction('GET /rest/api/2/myself', dict(user, self='https://jira.corp.test/rest/api/2/user')),
+        {'key': 'GET /robots.txt', 'status': 200, 'content_type': 'text/plain', 'body': 'not json',
+         'elapsed': 0.1},
+    ])
+
+    assert anonymize_cassette(str(src), str(dst), 'https://jira.corp.test/') == (2, 1)
+
+    first, second = load_cassette(str(dst))
+    body = json.loads(first['body'])
+    assert body['displayName'].startswith('user-')
+    assert body['emailAddress'].startswith('user-')
+    assert 'ivan@corp.test' not in first['body'] and 'Иван' not in first['body']
+    assert body['avatarUrls'] == {}
+    assert body['self'] == f'{ANONYMIZED_URL}/rest/api/2/user'
+    assert second['body'] == 'not json'
@@ -0,0 +1,99 @@
+import pytest
+
+from jira_monitor.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ConnectionError('down')
+
+
+@pytest.fixture
+def breaker(redis_client, clock):
+    return CircuitBreaker('jira', failure_threshold=2, recovery_timeout=60, redis_client=redis_client)
+
+
+def test_opens_after_threshold_and_fails_fast(breaker):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.get_state() == OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+
+
+def test_success_resets_failure_count(breaker):
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: 'ok') == 'ok'
+
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.get_state() == CLOSED
+
+
+def test_half_open_allows_single_trial(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock[0] += 61
+
+    assert breaker.get_state() == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+
+def test_half_open_trial_success_closes(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock[0] += 61
+
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.get_state() == CLOSED
+    assert breaker.describe()['failures'] == 0
+
+
+def test_half_open_trial_failure_reopens(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock[0] += 61
+
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.get_state() == OPEN
+    assert breaker.retry_after() == pytest.approx(60)
+
+
+def test_request_errors_do_not_open_circuit(redis_client, clock):
+    from jira.exceptions import JIRAError
+
+    from jira_monitor.clients.jira_client import is_jira_unavailable
+
+    breaker = CircuitBreaker('jira', failure_threshold=1, recovery_timeout=60, redis_client=redis_client,
+                             is_failure=is_jira_unavailable)
+
+    def bad_jql():
+        raise JIRAError(status_code=400, text='bad jql')
+
+    def server_error():
+        raise JIRAError(status_code=503, text='unavailable')
+
+    with pytest.raises(JIRAError):
+        breaker.call(bad_jql)
+    assert breaker.get_state() == CLOSED
+
+    with pytest.raises(JIRAError):
+        breaker.call(server_error)
+    assert breaker.get_state() == OPEN
+
+
+def test_smtp_permanent_errors_do_not_count():
+    import smtplib
+
+    from jira_monitor.clients.smtp_client import is_smtp_unavailable
+
+    assert is_smtp_unavailable(smtplib.SMTPServerDisconnected('gone')) is True
+    assert is_smtp_unavailable(smtplib.SMTPResponseException(421, b'try later')) is True
+    assert is_smtp_unavailable(smtplib.SMTPAuthenticationError(535, b'bad login')) is False
+    assert is_smtp_unavailable(ValueError('bug')) is False
@@ -0,0 +1,79 @@
+import pytest
+
+from jira_monitor.clients import EmailClient
+from jira_monitor.digest import DigestBuffer
+from jira_monitor.jira_monitor import JiraCompletedMonitor
+
+
+class RecordingOutbox:
+    def __init__(self):
+        self.messages = []
+
+    def enqueue(self, recipients, subject, content, subtype='html', idempotency_key=None):
+        self.messages.append((subject, content))
+        return True
+
+
+@pytest.fixture
+def digest(redis_client, clock):
+    return DigestBuffer('PRJ', window=300, max_size=3, redis_client=redis_client)
+
+
+@pytest.fixture
+def monitor(digest):
+    email_client = EmailClient(None, None, 'Product', 'Project', 'http://jira.test', 'PRJ')
+    return JiraCompletedMonitor(None, None, email_client, outbox=RecordingOutbox(), digest=digest)
+
+
+def test_duplicates_collapse_by_issue_key(digest):
+    digest.add('PRJ-1', 'first')
+    digest.add('PRJ-1', 'first again')
+
+    assert digest.size() == 1
+    assert digest.take() == {'PRJ-1': 'first again'}
+    assert digest.size() == 0
+
+
+def test_due_when_window_elapses(digest, clock):
+    assert digest.add('PRJ-1', 'one') is False
+    clock[0] += 299
+    assert digest.is_due() is False
+    clock[0] += 1
+    assert digest.is_due() is True
+
+
+def test_due_when_cap_reached(digest):
+    assert digest.add('PRJ-1', 'one') is False
+    assert digest.add('PRJ-2', 'two') is False
+    assert digest.add('PRJ-3', 'three') is True
+
+
+def test_monitor_flushes_single_digest_on_cap(monitor):
+    for key in ('PRJ-1', 'PRJ-2', 'PRJ-2', 'PRJ-3'):
+        monitor.send_simple_notification(key, f'summary {key}')
+
+    assert len(monitor.outbox.messages) == 1
+    subject, content = monitor.outbox.messages[0]
+    assert subject == 'Выполнено задач: 3'
+    assert 'PRJ-1' in content and 'PRJ-3' in content
+    assert monitor.digest.size() == 0
+
+
+def test_immediate_notification_bypasses_digest(monitor):
+    monitor.send_simple_notification('PRJ-7', 'urgent', immediate=True)
+
+    assert monitor.outbox.messages[0][0] == 'Задача PRJ-7 выполнена'
+    assert monitor.digest.size() == 0
+
+
+def test_failed_flush_restores_buffer(monitor, monkeypatch):
+    def broken_enqueue(*args, **kwargs):
+        raise ConnectionError('redis gone')
+
+    monitor.digest.add('PRJ-1', 'one')
+    monitor.digest.add('PRJ-2', 'two')
+    monkeypatch.setattr(monitor.outbox, 'enqueue', broken_enqueue)
+
+    with pytest.raises(ConnectionError):
+        monitor.flush_digest()
+    assert monitor.digest.take() == {'PRJ-1': 'one', 'PRJ-2': 'two'}
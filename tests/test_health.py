@@ -0,0 +1,78 @@
+import json
+from smtplib import SMTPResponseException
+
+import pytest
+
+from jira_monitor import health
+
+
+class FakeSession:
+    def __init__(self, code=250):
+        self.code = code
+        self.closed = False
+
+    def noop(self):
+        return self.code, b'OK'
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSMTPClient:
+    def __init__(self, *sessions):
+        self.sessions = list(sessions)
+
+    def get_connection(self):
+        return self.sessions.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def reset_session(monkeypatch):
+    monkeypatch.setattr(health, '_smtp_session', None)
+
+
+def test_smtp_probe_reuses_session():
+    session = FakeSession()
+    client = FakeSMTPClient(session)
+
+    health._probe_smtp(client)
+    health._probe_smtp(client)
+
+    assert health._smtp_session is session
+    assert not session.closed
+
+
+def test_smtp_probe_rejects_non_250_noop():
+    broken = FakeSession(code=421)
+
+    with pytest.raises(SMTPResponseException):
+        health._probe_smtp(FakeSMTPClient(broken))
+
+    assert broken.closed
+    assert health._smtp_session is None
+
+
+def test_pooled_session_is_replaced_after_non_250_noop():
+    pooled, fresh = FakeSession(), FakeSession()
+    client = FakeSMTPClient(pooled, fresh)
+    health._probe_smtp(client)
+
+    # сервер закрывает сессию по таймауту, но соединение еще отвечает
+    pooled.code = 421
+    health._probe_smtp(client)
+
+    assert pooled.closed
+    assert health._smtp_session is fresh
+
+
+def test_read_health_marks_stale_results(redis_client):
+    redis_client.hset(health.HEALTH_KEY, mapping={
+        'smtp': json.dumps({'ok': True, 'checked_at': 1000.0}),
+        'jira': json.dumps({'ok': True, 'checked_at': 900.0}),
+    })
+
+    result = health.read_health(redis_client, now=1010.0)
+
+    assert result['probes']['smtp']['stale'] is False
+    assert result['probes']['jira']['stale'] is True
+    assert result['ok'] is False
@@ -0,0 +1,121 @@
+from smtplib import SMTPServerDisconnected
+
+import pytest
+
+from jira_monitor.outbox import Outbox
+
+
+class FakeConnection:
+    def __init__(self, smtp):
+        self.smtp = smtp
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send_message(self, msg):
+        if self.smtp.disconnect_after is not None and len(self.smtp.sent) >= self.smtp.disconnect_after:
+            raise SMTPServerDisconnected('Connection unexpectedly closed')
+        if self.smtp.fail:
+            raise OSError('relay refused')
+        self.smtp.sent.append(msg['Subject'])
+
+
+class FakeSMTPClient:
+    email_user = 'bot@test'
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.disconnect_after = None
+        self.sent = []
+        self.connections = 0
+
+    def get_connection(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+
+@pytest.fixture
+def smtp():
+    return FakeSMTPClient()
+
+
+@pytest.fixture
+def outbox(redis_client, smtp):
+    return Outbox(smtp_client=smtp, redis_client=redis_client, batch_size=10, max_attempts=2, retry_delay=60,
+                  claim_idle_seconds=0)
+
+
+def test_duplicate_enqueue_is_suppressed(outbox):
+    assert outbox.enqueue(['a@test'], 'Отчет', '<p>1</p>') is True
+    assert outbox.enqueue(['a@test'], 'Отчет', '<p>1</p>') is False
+    assert outbox.enqueue(['a@test'], 'Отчет', '<p>2</p>') is True
+    assert outbox.describe()['queued'] == 2
+
+
+def test_drain_sends_batch_over_one_session(outbox, smtp):
+    outbox.enqueue(['a@test'], 'Первый', 'text', 'plain')
+    outbox.enqueue(['a@test'], 'Второй', 'text', 'plain')
+
+    stats = outbox.drain()
+
+    assert stats == {'sent': 2, 'skipped': 0, 'failed': 0, 'deferred': 0}
+    assert smtp.sent == ['Первый', 'Второй']
+    assert smtp.connections == 1
+    assert outbox.describe() == {'queued': 0, 'delayed': 0, 'dead': 0}
+
+
+def test_failed_message_waits_for_backoff_then_dead_lettered(outbox, smtp, clock):
+    smtp.fail = True
+    outbox.enqueue(['a@test'], 'Отчет', 'text', 'plain')
+
+    assert outbox.drain()['failed'] == 1
+    assert outbox.describe() == {'queued': 0, 'delayed': 1, 'dead': 0}
+
+    # пауза перед повтором еще не истекла
+    clock[0] += 59
+    assert outbox.drain()['failed'] == 0
+    assert outbox.describe() == {'queued': 0, 'delayed': 1, 'dead': 0}
+
+    clock[0] += 1
+    assert outbox.drain()['failed'] == 1
+    assert outbox.describe() == {'queued': 0, 'delayed': 0, 'dead': 1}
+
+    # недоставленный отчет снова можно поставить в очередь
+    assert outbox.enqueue(['a@test'], 'Отчет', 'text', 'plain') is True
+
+
+def test_already_sent_message_is_skipped(outbox, smtp, redis_client):
+    outbox.enqueue(['a@test'], 'Отчет', 'text', 'plain', idempotency_key='k1')
+    redis_client.set(outbox._sent_key('k1'), 1)
+
+    assert outbox.drain() == {'sent': 0, 'skipped': 1, 'failed': 0, 'deferred': 0}
+    assert smtp.sent == []
+
+
+def test_disconnect_stops_batch_without_counting_attempts(outbox, smtp):
+    for subject in ('Первый', 'Второй', 'Третий'):
+        outbox.enqueue(['a@test'], subject, 'text', 'plain')
+    smtp.disconnect_after = 1
+
+    assert outbox.drain() == {'sent': 1, 'skipped': 0, 'failed': 0, 'deferred': 2}
+    assert outbox.describe() == {'queued': 2, 'delayed': 0, 'dead': 0}
+
+    smtp.disconnect_after = None
+    assert outbox.drain() == {'sent': 2, 'skipped': 0, 'failed': 0, 'deferred': 0}
+    assert smtp.sent == ['Первый', 'Второй', 'Третий']
+    assert smtp.connections == 2
+
+
+def test_failed_xadd_releases_idempotency_key(outbox, redis_client, monkeypatch):
+    def broken_xadd(*args, **kwargs):
+        raise ConnectionError('redis gone')
+
+    monkeypatch.setattr(redis_client, 'xadd', broken_xadd)
+    with pytest.raises(ConnectionError):
+        outbox.enqueue(['a@test'], 'Отчет', 'text', idempotency_key='k1')
+    monkeypatch.undo()
+
+    assert outbox.enqueue(['a@test'], 'Отчет', 'text', idempotency_key='k1') is True
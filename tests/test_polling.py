@@ -0,0 +1,89 @@
+import pytest
+
+from jira_monitor.polling import AdaptivePoller
+
+
+class FakeJiraClient:
+    def __init__(self):
+        self.probe = {'period_start': '2024-05-01T09:00:00', 'total': 10, 'last_updated': 'u1'}
+
+    def probe_changes(self):
+        return dict(self.probe)
+
+
+@pytest.fixture
+def jira_client():
+    return FakeJiraClient()
+
+
+@pytest.fixture
+def poller(redis_client, clock):
+    poller = AdaptivePoller('PRJ', redis_client=redis_client)
+    poller.min_interval = 20
+    poller.max_interval = 160
+    poller.backoff_factor = 2
+    poller.pending_timeout = 900
+    return poller
+
+
+def test_change_stays_pending_until_confirmed(poller, jira_client):
+    fingerprint = poller.check(jira_client)
+    assert fingerprint is not None
+
+    # пока проверка не подтверждена, тот же отпечаток не запускает ее повторно
+    assert poller.check(jira_client) is None
+
+    poller.confirm(fingerprint)
+    assert poller.get_state()['fingerprint'] == fingerprint
+    assert 'pending' not in poller.get_state()
+    assert poller.check(jira_client) is None
+
+
+def test_release_retriggers_check(poller, jira_client, clock):
+    fingerprint = poller.check(jira_client)
+    poller.release(fingerprint)
+
+    assert poller.is_due()
+    assert poller.check(jira_client) == fingerprint
+
+
+def test_stale_pending_is_ignored(poller, jira_client, clock):
+    fingerprint = poller.check(jira_client)
+    clock[0] += 899
+    assert poller.check(jira_client) is None
+
+    clock[0] += 1
+    assert poller.check(jira_client) == fingerprint
+
+
+def test_quiet_project_backs_off_and_snaps_back(poller, jira_client, clock):
+    poller.confirm(poller.check(jira_client))
+
+    intervals = []
+    for _ in range(4):
+        poller.check(jira_client)
+        intervals.append(poller.describe()['interval'])
+    assert intervals == [40, 80, 160, 160]
+
+    jira_client.probe['last_updated'] = 'u2'
+    assert poller.check(jira_client) is not None
+    assert poller.describe()['interval'] == 20
+
+
+def test_period_rollover_is_a_change(poller, jira_client):
+    poller.confirm(poller.check(jira_client))
+
+    jira_client.probe['period_start'] = '2024-06-01T09:00:00'
+    assert poller.check(jira_client) is not None
+
+
+def test_failed_fetch_is_not_reported_as_no_issues():
+    from jira_monitor.jira_monitor import JiraCompletedMonitor
+
+    class BrokenJiraClient:
+        def filter_completed_issues(self, **kwargs):
+            return {'issues': [], 'total': 0}, None
+
+    monitor = JiraCompletedMonitor(None, BrokenJiraClient(), None)
+    success, _ = monitor.run_report()
+    assert success is False
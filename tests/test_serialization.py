@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+from kombu.serialization import dumps as kombu_dumps, loads as kombu_loads
+
+from jira_monitor.config import settings
+from jira_monitor.serialization import (
+    CONTENT_TYPE, RAW, SERIALIZER_NAME, ZLIB, loads, make_sample_payload, register_serializer
+)
+
+
+@pytest.fixture(autouse=True)
+def serializer(monkeypatch):
+    register_serializer()
+    monkeypatch.setattr(settings.serialization_settings, 'compression', 'zlib')
+    monkeypatch.setattr(settings.serialization_settings, 'compress_threshold', 1024)
+
+
+def round_trip(payload):
+    content_type, content_encoding, data = kombu_dumps(payload, serializer=SERIALIZER_NAME)
+    assert content_type == CONTENT_TYPE
+    return data, kombu_loads(data, content_type, content_encoding)
+
+
+def test_small_payload_is_not_compressed():
+    payload = {'key': 'PRJ-1', 'total': 1}
+
+    data, decoded = round_trip(payload)
+
+    assert data[:1] == RAW
+    assert decoded == payload
+
+
+def test_large_payload_is_compressed():
+    payload = make_sample_payload(50)
+
+    data, decoded = round_trip(payload)
+
+    assert data[:1] == ZLIB
+    assert decoded == payload
+
+
+def test_datetime_is_encoded_as_isoformat():
+    _, decoded = round_trip({'updated': datetime(2024, 5, 1, 12, 30)})
+
+    assert decoded == {'updated': '2024-05-01T12:30:00'}
+
+
+def test_unknown_header_is_rejected():
+    with pytest.raises(ValueError):
+        loads(b'\x7f' + b'payload')